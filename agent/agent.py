@@ -15,19 +15,28 @@ Recommended setup:
 """
 
 import argparse
+import csv
 import json
 import logging
+import mmap
 import os
 import re
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
-from flask import Flask, request, jsonify
+import orjson
+from flask import Flask, request
+from waitress import serve
 
 # Configuration from environment or defaults
 NORIBEN_PATH = os.getenv("AGENT_NORIBEN_PATH", "Noriben.py")
@@ -36,9 +45,26 @@ ANALYSIS_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "300"))  # 5 minutes
 WORK_DIR = os.getenv("AGENT_WORK_DIR", "./agent_work")
 AGENT_PORT = int(os.getenv("AGENT_PORT", "9090"))
 AGENT_HOST = os.getenv("AGENT_HOST", "0.0.0.0")  # Listen on all interfaces
+AGENT_THREADS = int(os.getenv("AGENT_THREADS", "8"))  # Request handler threads
 UNZIP_TOOL = os.getenv("AGENT_UNZIP_TOOL", "7z")  # Options: "7z", "unzip", or "python"
 UNZIP_PATH = os.getenv("AGENT_UNZIP_PATH", "7z")  # Path to unzip tool executable
 
+# Noriben location and the fixed part of its command line, resolved once at
+# startup; only --cmd and --output change between analyses
+_ABS_NORIBEN_PATH = os.path.abspath(NORIBEN_PATH)
+_NORIBEN_CWD = os.path.dirname(_ABS_NORIBEN_PATH)
+_NORIBEN_CMD_PREFIX = (PYTHON_PATH, _ABS_NORIBEN_PATH, "--timeout", str(ANALYSIS_TIMEOUT), "--headless")
+
+# Sample extensions looked for in extracted zips, most preferred first
+EXECUTABLE_EXTENSIONS = ('.exe', '.dll', '.scr', '.bat', '.cmd', '.ps1')
+
+# Passwords tried on protected zips when none is given, pre-encoded and
+# pre-formatted as extraction tool arguments
+COMMON_ZIP_PASSWORDS = ('infected', 'malware', 'virus', 'password')
+_COMMON_ZIP_PASSWORDS_BYTES = tuple(pwd.encode() for pwd in COMMON_ZIP_PASSWORDS)
+_SEVENZIP_PASSWORD_ARGS = tuple((pwd, f"-p{pwd}") for pwd in COMMON_ZIP_PASSWORDS)
+_UNZIP_PASSWORD_ARGS = tuple((pwd, ("-P", pwd)) for pwd in COMMON_ZIP_PASSWORDS)
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,9 +72,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger("cupax-agent")
 
+# Background workers that delete analysis artifacts after the response is sent
+cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+
+# Subprocess output kept per stream: the last OUTPUT_TAIL_CHUNKS reads of up
+# to OUTPUT_CHUNK_SIZE bytes (4 KiB), enough for logs and error messages
+OUTPUT_CHUNK_SIZE = 128
+OUTPUT_TAIL_CHUNKS = 32
+# How long to wait for output pipes to close once the process has exited
+# (processes started by the sample can inherit and hold them open)
+OUTPUT_DRAIN_TIMEOUT = 5
+
+
+def _drain_output(stream, tail: deque) -> None:
+    """Read a pipe until EOF, keeping only the most recent chunks"""
+    with stream:
+        for chunk in iter(lambda: stream.read1(OUTPUT_CHUNK_SIZE), b''):
+            tail.append(chunk)
+
+
+def run_command(cmd: List[str], timeout: float, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Run a command like subprocess.run, keeping only the tail of its output"""
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd)
+
+    tails = (deque(maxlen=OUTPUT_TAIL_CHUNKS), deque(maxlen=OUTPUT_TAIL_CHUNKS))
+    readers = [
+        threading.Thread(target=_drain_output, args=(stream, tail), daemon=True)
+        for stream, tail in zip((process.stdout, process.stderr), tails)
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        deadline = time.monotonic() + OUTPUT_DRAIN_TIMEOUT
+        for reader in readers:
+            reader.join(max(0, deadline - time.monotonic()))
+
+    stdout, stderr = (b''.join(tail).decode(errors='replace') for tail in tails)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
 # Flask app
 app = Flask(__name__)
 
+# I/O buffer sizes for Noriben timeline CSVs and uploaded samples
+CSV_READ_BUFFER = 1 << 20
+UPLOAD_BUFFER = 1 << 20
+
+# Noriben TXT report: timing lines in the header, then '='-underlined
+# sections whose entries run until the next blank line. One pattern so the
+# whole report is scanned in a single pass. Bytes patterns so it can run
+# directly over the mapped file (Noriben writes CRLF line endings).
+# Every repeat is bounded by a newline or a literal, so matching stays
+# linear in the report size whatever the report contains.
+_RE_REPORT = re.compile(
+    rb'(?P<timing>Execution|Processing|Analysis) time: (?P<seconds>[\d.]+) seconds'
+    rb'|^(?P<section>Processes Created|File Activity|Registry Activity|Network Traffic|Unique Hosts)'
+    rb':\r?\n={15,}(?P<body>(?:\r?\n[^\r\n]+)*)',
+    re.MULTILINE
+)
+_TIMING_KEYS = {
+    b"Execution": "execution_time",
+    b"Processing": "processing_time",
+    b"Analysis": "analysis_time"
+}
+_SECTION_KEYS = {
+    b"Processes Created": "processes_created",
+    b"File Activity": "files_created",
+    b"Registry Activity": "registry_modified",
+    b"Network Traffic": "network_connections"
+}
+
+
+# Timeline event records. Slotted to keep long timelines small in memory;
+# orjson serializes them as JSON objects matching the backend models.
+@dataclass
+class ProcessEvent:
+    __slots__ = ("timestamp", "process_name", "pid", "command_line", "child_pid")
+    timestamp: str
+    process_name: str
+    pid: str
+    command_line: str
+    child_pid: str
+
+
+@dataclass
+class FileEvent:
+    __slots__ = ("timestamp", "operation", "process_name", "pid", "path",
+                 "hash_type", "hash", "yara_hits", "vt_hits", "to_path")
+    timestamp: str
+    operation: str
+    process_name: str
+    pid: str
+    path: str
+    hash_type: str
+    hash: str
+    yara_hits: str
+    vt_hits: str
+    to_path: str
+
+
+@dataclass
+class RegistryEvent:
+    __slots__ = ("timestamp", "operation", "process_name", "pid", "path", "data")
+    timestamp: str
+    operation: str
+    process_name: str
+    pid: str
+    path: str
+    data: str
+
+
+@dataclass
+class NetworkEvent:
+    __slots__ = ("timestamp", "protocol", "direction", "process_name", "pid", "remote_addr")
+    timestamp: str
+    protocol: str
+    direction: str
+    process_name: str
+    pid: str
+    remote_addr: str
+
 
 class NoribenParser:
     """Parser for Noriben output files"""
@@ -57,9 +207,6 @@ class NoribenParser:
     def parse_txt_report(filepath: str) -> Dict[str, Any]:
         """Parse the Noriben .txt summary report"""
         try:
-            with open(filepath, 'r', encoding='utf-8-sig', errors='ignore') as f:
-                content = f.read()
-
             summary = {
                 "execution_time": 0.0,
                 "processing_time": 0.0,
@@ -70,41 +217,35 @@ class NoribenParser:
                 "network_connections": 0
             }
 
-            # Extract timing information
-            exec_match = re.search(r'Execution time: ([\d.]+) seconds', content)
-            if exec_match:
-                summary["execution_time"] = float(exec_match.group(1))
-
-            proc_match = re.search(r'Processing time: ([\d.]+) seconds', content)
-            if proc_match:
-                summary["processing_time"] = float(proc_match.group(1))
-
-            anal_match = re.search(r'Analysis time: ([\d.]+) seconds', content)
-            if anal_match:
-                summary["analysis_time"] = float(anal_match.group(1))
-
-            # Count events by section
-            process_section = re.search(r'Processes Created:\n={15,}\n(.*?)(?:\n\n|\Z)', content, re.DOTALL)
-            if process_section:
-                summary["processes_created"] = len([l for l in process_section.group(1).split('\n') if l.strip()])
-
-            file_section = re.search(r'File Activity:\n={15,}\n(.*?)(?:\n\n|\Z)', content, re.DOTALL)
-            if file_section:
-                summary["files_created"] = len([l for l in file_section.group(1).split('\n') if l.strip()])
-
-            reg_section = re.search(r'Registry Activity:\n={15,}\n(.*?)(?:\n\n|\Z)', content, re.DOTALL)
-            if reg_section:
-                summary["registry_modified"] = len([l for l in reg_section.group(1).split('\n') if l.strip()])
-
-            net_section = re.search(r'Network Traffic:\n={15,}\n(.*?)(?:\n\n|\Z)', content, re.DOTALL)
-            if net_section:
-                summary["network_connections"] = len([l for l in net_section.group(1).split('\n') if l.strip()])
-
-            # Extract unique hosts
-            hosts_section = re.search(r'Unique Hosts:\n={15,}\n(.*?)(?:\n\n|\Z)', content, re.DOTALL)
+            # Extract timing information, section counts and unique hosts
             unique_hosts = []
-            if hosts_section:
-                unique_hosts = [h.strip() for h in hosts_section.group(1).split('\n') if h.strip()]
+            with open(filepath, 'rb') as f:
+                # Scan the mapped file instead of reading a decoded copy;
+                # an empty file can't be mapped and has nothing to parse
+                if os.fstat(f.fileno()).st_size == 0:
+                    return {"summary": summary, "unique_hosts": unique_hosts}
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    # Only the first hit of each item counts: anything after the
+                    # header (e.g. the ERRORS DETECTED block) is sample-controlled
+                    seen = set()
+                    for match in _RE_REPORT.finditer(content):
+                        timing = match.group('timing')
+                        section = match.group('section')
+                        if (timing or section) in seen:
+                            continue
+                        seen.add(timing or section)
+
+                        if timing:
+                            summary[_TIMING_KEYS[timing]] = float(match.group('seconds'))
+                            continue
+
+                        # Every body entry is a newline followed by a non-empty line
+                        body = match.group('body')
+                        if section == b"Unique Hosts":
+                            unique_hosts = [h.strip().decode('utf-8', 'ignore') for h in body.split(b'\n') if h.strip()]
+                        else:
+                            summary[_SECTION_KEYS[section]] = body.count(b'\n')
 
             return {"summary": summary, "unique_hosts": unique_hosts}
 
@@ -113,10 +254,8 @@ class NoribenParser:
             return {"summary": {}, "unique_hosts": []}
 
     @staticmethod
-    def parse_csv_timeline(filepath: str) -> Dict[str, List[Dict]]:
+    def parse_csv_timeline(filepath: str) -> Dict[str, List[Any]]:
         """Parse the Noriben timeline CSV"""
-        import csv
-
         events = {
             "process_activity": [],
             "file_system": [],
@@ -125,76 +264,25 @@ class NoribenParser:
         }
 
         try:
-            with open(filepath, 'r', encoding='utf-8-sig', errors='ignore') as f:
+            # csv.reader is the C _csv parser; hand it large reads and leave
+            # newline handling to it (rows are ragged, so pyarrow can't be used)
+            with open(filepath, 'r', encoding='utf-8-sig', errors='ignore',
+                      newline='', buffering=CSV_READ_BUFFER) as f:
+                # Bind each category's builder to its output list once, so a
+                # row costs a single lookup before its event is appended
+                sinks = {
+                    category: (builder, events[key].append)
+                    for category, (key, builder) in _TIMELINE_BUILDERS.items()
+                }
                 reader = csv.reader(f)
                 for row in reader:
                     if len(row) < 3:
                         continue
 
-                    timestamp = row[0]
-                    category = row[1]
-                    operation = row[2]
-
-                    if category == "Process":
-                        events["process_activity"].append({
-                            "timestamp": timestamp,
-                            "process_name": row[3] if len(row) > 3 else "",
-                            "pid": row[4] if len(row) > 4 else "",
-                            "command_line": row[5] if len(row) > 5 else "",
-                            "child_pid": row[6] if len(row) > 6 else ""
-                        })
-
-                    elif category == "File":
-                        event = {
-                            "timestamp": timestamp,
-                            "operation": operation,
-                            "process_name": row[3] if len(row) > 3 else "",
-                            "pid": row[4] if len(row) > 4 else "",
-                            "path": row[5] if len(row) > 5 else ""
-                        }
-
-                        if len(row) > 6:
-                            event["hash_type"] = row[6] if row[6] else ""
-                        if len(row) > 7:
-                            event["hash"] = row[7] if row[7] else ""
-                        if len(row) > 8:
-                            event["yara_hits"] = row[8] if row[8] else ""
-                        if len(row) > 9:
-                            event["vt_hits"] = row[9] if row[9] else ""
-
-                        if operation == "RenameFile" and len(row) > 6:
-                            event["to_path"] = row[6]
-
-                        events["file_system"].append(event)
-
-                    elif category == "Registry":
-                        event = {
-                            "timestamp": timestamp,
-                            "operation": operation,
-                            "process_name": row[3] if len(row) > 3 else "",
-                            "pid": row[4] if len(row) > 4 else "",
-                            "path": row[5] if len(row) > 5 else "",
-                            "data": row[6] if len(row) > 6 else ""
-                        }
-                        events["registry"].append(event)
-
-                    elif category == "Network":
-                        protocol = operation
-                        direction = "Unknown"
-                        if ' ' in operation:
-                            parts = operation.split(' ', 1)
-                            protocol = parts[0]
-                            direction = parts[1] if len(parts) > 1 else "Unknown"
-
-                        event = {
-                            "timestamp": timestamp,
-                            "protocol": protocol,
-                            "direction": direction,
-                            "process_name": row[3] if len(row) > 3 else "",
-                            "pid": row[4] if len(row) > 4 else "",
-                            "remote_addr": row[5] if len(row) > 5 else ""
-                        }
-                        events["network"].append(event)
+                    sink = sinks.get(row[1])
+                    if sink:
+                        build, append = sink
+                        append(build(row))
 
             return events
 
@@ -202,6 +290,84 @@ class NoribenParser:
             logger.error(f"Failed to parse CSV timeline: {e}")
             return events
 
+    @staticmethod
+    def _build_process_event(row: List[str]) -> ProcessEvent:
+        """Build a process_activity event from a timeline row"""
+        n = len(row)
+        return ProcessEvent(
+            timestamp=row[0],
+            process_name=row[3] if n > 3 else "",
+            pid=row[4] if n > 4 else "",
+            command_line=row[5] if n > 5 else "",
+            child_pid=row[6] if n > 6 else ""
+        )
+
+    @staticmethod
+    def _build_file_event(row: List[str]) -> FileEvent:
+        """Build a file_system event from a timeline row"""
+        n = len(row)
+        operation = row[2]
+        return FileEvent(
+            timestamp=row[0],
+            operation=operation,
+            process_name=row[3] if n > 3 else "",
+            pid=row[4] if n > 4 else "",
+            path=row[5] if n > 5 else "",
+            hash_type=row[6] if n > 6 else "",
+            hash=row[7] if n > 7 else "",
+            yara_hits=row[8] if n > 8 else "",
+            vt_hits=row[9] if n > 9 else "",
+            to_path=row[6] if operation == "RenameFile" and n > 6 else ""
+        )
+
+    @staticmethod
+    def _build_registry_event(row: List[str]) -> RegistryEvent:
+        """Build a registry event from a timeline row"""
+        n = len(row)
+        return RegistryEvent(
+            timestamp=row[0],
+            operation=row[2],
+            process_name=row[3] if n > 3 else "",
+            pid=row[4] if n > 4 else "",
+            path=row[5] if n > 5 else "",
+            data=row[6] if n > 6 else ""
+        )
+
+    @staticmethod
+    def _build_network_event(row: List[str]) -> NetworkEvent:
+        """Build a network event from a timeline row"""
+        n = len(row)
+        protocol, sep, direction = row[2].partition(' ')
+        if not sep:
+            direction = "Unknown"
+
+        return NetworkEvent(
+            timestamp=row[0],
+            protocol=protocol,
+            direction=direction,
+            process_name=row[3] if n > 3 else "",
+            pid=row[4] if n > 4 else "",
+            remote_addr=row[5] if n > 5 else ""
+        )
+
+
+# Timeline category -> (events key, event builder)
+_TIMELINE_BUILDERS = {
+    "Process": ("process_activity", NoribenParser._build_process_event),
+    "File": ("file_system", NoribenParser._build_file_event),
+    "Registry": ("registry", NoribenParser._build_registry_event),
+    "Network": ("network", NoribenParser._build_network_event)
+}
+
+
+@dataclass
+class AnalysisPaths:
+    """Work directory locations of one analysis, built once per request"""
+    __slots__ = ("analysis_id", "output_dir", "extract_dir")
+    analysis_id: str
+    output_dir: Path
+    extract_dir: Path
+
 
 class MalwareAnalyzer:
     """Handles malware analysis with Noriben"""
@@ -210,11 +376,19 @@ class MalwareAnalyzer:
         self.work_dir = Path(WORK_DIR)
         self.work_dir.mkdir(exist_ok=True, parents=True)
 
-    def extract_zip(self, zip_path: str, analysis_id: str, password: Optional[str] = None) -> Optional[str]:
+    def analysis_paths(self, analysis_id: str) -> AnalysisPaths:
+        """Build the output and extraction directories for an analysis"""
+        return AnalysisPaths(
+            analysis_id=analysis_id,
+            output_dir=self.work_dir / analysis_id,
+            # Use consistent naming: {analysis_id}_extracted
+            extract_dir=self.work_dir / f"{analysis_id}_extracted"
+        )
+
+    def extract_zip(self, zip_path: str, paths: AnalysisPaths, password: Optional[str] = None) -> Optional[str]:
         """Extract zip file and return path to executable"""
         try:
-            # Use consistent naming: {analysis_id}_extracted
-            extract_dir = self.work_dir / f"{analysis_id}_extracted"
+            extract_dir = paths.extract_dir
             extract_dir.mkdir(exist_ok=True, parents=True)
             logger.info(f"Extracting to: {extract_dir}")
 
@@ -231,17 +405,11 @@ class MalwareAnalyzer:
                 return None
 
             # Find executable file
-            executables = []
-            for ext in ['*.exe', '*.dll', '*.scr', '*.bat', '*.cmd', '*.ps1']:
-                executables.extend(extract_dir.glob(ext))
-                executables.extend(extract_dir.glob(f'**/{ext}'))
-
-            if not executables:
+            exe_path = self._find_executable(extract_dir)
+            if not exe_path:
                 logger.error("No executable found in zip")
                 return None
 
-            # Return first executable
-            exe_path = str(executables[0])
             logger.info(f"Extracted executable: {exe_path}")
             return exe_path
 
@@ -249,26 +417,35 @@ class MalwareAnalyzer:
             logger.error(f"Failed to extract zip: {e}")
             return None
 
+    @staticmethod
+    def _find_executable(extract_dir: Path) -> Optional[str]:
+        """Find the extracted sample in one walk, by EXECUTABLE_EXTENSIONS preference"""
+        found = {}
+        for root, _, files in os.walk(extract_dir):
+            for name in files:
+                ext = os.path.splitext(name)[1].lower()
+                if ext in EXECUTABLE_EXTENSIONS and ext not in found:
+                    found[ext] = os.path.join(root, name)
+                    # Nothing can beat the first .exe; top-level files are walked first
+                    if ext == EXECUTABLE_EXTENSIONS[0]:
+                        return found[ext]
+
+        return next((found[ext] for ext in EXECUTABLE_EXTENSIONS if ext in found), None)
+
     def _extract_with_7z(self, zip_path: str, extract_dir: Path, password: Optional[str] = None) -> bool:
         """Extract using 7-Zip (most robust, supports all formats)"""
         try:
-            cmd = [UNZIP_PATH, "x", zip_path, f"-o{extract_dir}", "-y"]
+            base_cmd = [UNZIP_PATH, "x", zip_path, f"-o{extract_dir}", "-y"]
 
             if password:
-                cmd.append(f"-p{password}")
+                cmd = base_cmd + [f"-p{password}"]
             else:
                 # Try without password first
-                cmd.append("-p")  # Empty password
+                cmd = base_cmd + ["-p"]  # Empty password
 
             logger.info(f"Extracting with 7z: {' '.join(cmd[:4])}...")  # Don't log password
 
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=30
-            )
+            result = run_command(cmd, timeout=30)
 
             if result.returncode == 0:
                 logger.info("7z extraction successful")
@@ -276,10 +453,8 @@ class MalwareAnalyzer:
             else:
                 # Try common passwords if first attempt failed
                 if not password:
-                    common_passwords = ['infected', 'malware', 'virus', 'password']
-                    for pwd in common_passwords:
-                        cmd_with_pwd = [UNZIP_PATH, "x", zip_path, f"-o{extract_dir}", "-y", f"-p{pwd}"]
-                        result = subprocess.run(cmd_with_pwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30)
+                    for pwd, pwd_arg in _SEVENZIP_PASSWORD_ARGS:
+                        result = run_command(base_cmd + [pwd_arg], timeout=30)
                         if result.returncode == 0:
                             logger.info(f"7z extraction successful with password: {pwd}")
                             return True
@@ -294,20 +469,17 @@ class MalwareAnalyzer:
     def _extract_with_unzip(self, zip_path: str, extract_dir: Path, password: Optional[str] = None) -> bool:
         """Extract using unzip.exe (UnixUtils for Windows)"""
         try:
-            cmd = [UNZIP_PATH, "-o", zip_path, "-d", str(extract_dir)]
+            # Options must precede the zip path, or unzip reads them as member names
+            target_args = [zip_path, "-d", str(extract_dir)]
+            cmd = [UNZIP_PATH, "-o"]
 
             if password:
                 cmd.extend(["-P", password])
+            cmd.extend(target_args)
 
-            logger.info(f"Extracting with unzip: {' '.join(cmd[:4])}...")
+            logger.info(f"Extracting with unzip: {UNZIP_PATH} -o {zip_path} -d {extract_dir}...")  # Don't log password
 
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=30
-            )
+            result = run_command(cmd, timeout=30)
 
             if result.returncode == 0:
                 logger.info("unzip extraction successful")
@@ -315,10 +487,8 @@ class MalwareAnalyzer:
             else:
                 # Try common passwords
                 if not password:
-                    common_passwords = ['infected', 'malware', 'virus', 'password']
-                    for pwd in common_passwords:
-                        cmd_with_pwd = [UNZIP_PATH, "-o", zip_path, "-d", str(extract_dir), "-P", pwd]
-                        result = subprocess.run(cmd_with_pwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30)
+                    for pwd, pwd_args in _UNZIP_PASSWORD_ARGS:
+                        result = run_command([UNZIP_PATH, "-o", *pwd_args, *target_args], timeout=30)
                         if result.returncode == 0:
                             logger.info(f"unzip extraction successful with password: {pwd}")
                             return True
@@ -346,15 +516,12 @@ class MalwareAnalyzer:
                         logger.info("Python zipfile extraction successful")
                         return True
                     except RuntimeError:
-                        # Try common passwords
-                        common_passwords = ['infected', 'malware', 'virus', 'password']
-                        for pwd in common_passwords:
-                            try:
-                                zip_ref.extractall(extract_dir, pwd=pwd.encode())
-                                logger.info(f"Python zipfile extraction successful with password: {pwd}")
-                                return True
-                            except RuntimeError:
-                                continue
+                        # Try common passwords, extracting only with one that matches
+                        pwd = self._find_zip_password(zip_ref)
+                        if pwd:
+                            zip_ref.extractall(extract_dir, pwd=pwd)
+                            logger.info(f"Python zipfile extraction successful with password: {pwd.decode()}")
+                            return True
 
                         logger.error("Python zipfile: password required or unsupported compression")
                         return False
@@ -363,55 +530,63 @@ class MalwareAnalyzer:
             logger.error(f"Python zipfile extraction error: {e}")
             return False
 
-    def run_noriben(self, sample_path: str, analysis_id: str) -> Dict[str, Any]:
+    @staticmethod
+    def _find_zip_password(zip_ref: zipfile.ZipFile) -> Optional[bytes]:
+        """Find which common password opens the first encrypted zip member"""
+        encrypted = next((info for info in zip_ref.infolist() if info.flag_bits & 0x1), None)
+        if encrypted is None:
+            return None
+
+        for pwd in _COMMON_ZIP_PASSWORDS_BYTES:
+            try:
+                # Opening a member only decrypts and checks its 12-byte ZipCrypto header
+                zip_ref.open(encrypted, pwd=pwd).close()
+                return pwd
+            except RuntimeError:
+                continue
+
+        return None
+
+    def run_noriben(self, sample_path: str, paths: AnalysisPaths) -> Dict[str, Any]:
         """Execute Noriben analysis"""
         try:
-            logger.info(f"Starting Noriben analysis: {analysis_id}")
+            logger.info(f"Starting Noriben analysis: {paths.analysis_id}")
 
             # Create output directory
-            output_dir = self.work_dir / analysis_id
+            output_dir = paths.output_dir
             output_dir.mkdir(exist_ok=True, parents=True)
 
             # Convert paths to absolute paths
             abs_sample_path = os.path.abspath(sample_path)
-            abs_noriben_path = os.path.abspath(NORIBEN_PATH)
-            abs_output_dir = os.path.abspath(str(output_dir))
+            abs_output_dir = os.path.abspath(output_dir)
 
             # Verify sample file exists
-            if not os.path.exists(abs_sample_path):
+            try:
+                sample_size = os.stat(abs_sample_path).st_size
+            except FileNotFoundError:
                 logger.error(f"Sample file not found: {abs_sample_path}")
                 return {
                     "success": False,
                     "error": f"Sample file not found: {abs_sample_path}"
                 }
 
-            cmd = [
-                PYTHON_PATH,
-                abs_noriben_path,
-                "--cmd", abs_sample_path,
-                "--timeout", str(ANALYSIS_TIMEOUT),
-                "--headless",
-                "--output", abs_output_dir
-            ]
+            cmd = [*_NORIBEN_CMD_PREFIX, "--cmd", abs_sample_path, "--output", abs_output_dir]
 
             logger.info(f"Executing: {' '.join(cmd)}")
 
             # Run Noriben with timeout
-            logger.info(f"Sample file size: {os.path.getsize(abs_sample_path)} bytes")
+            logger.info(f"Sample file size: {sample_size} bytes")
             logger.info(f"Working directory: {os.getcwd()}")
 
-            process = subprocess.run(
+            process = run_command(
                 cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
                 timeout=ANALYSIS_TIMEOUT + 60,
-                text=True,
-                cwd=os.path.dirname(abs_noriben_path)  # Run from Noriben directory
+                cwd=_NORIBEN_CWD  # Run from Noriben directory
             )
 
             logger.info(f"Noriben returned with code: {process.returncode}")
             if process.stdout:
-                logger.info(f"STDOUT: {process.stdout[:500]}")  # Log first 500 chars
+                logger.info(f"STDOUT (tail): {process.stdout}")
 
             if process.returncode != 0:
                 logger.error(f"Noriben failed with code {process.returncode}")
@@ -449,42 +624,54 @@ class MalwareAnalyzer:
                 "error": str(e)
             }
         finally:
-            # Cleanup sample and temp files
-            try:
-                if os.path.exists(sample_path):
-                    os.remove(sample_path)
-                    logger.info(f"Cleaned up sample: {sample_path}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup sample: {e}")
+            # Cleanup sample and extraction directory off the request path, in
+            # one task: an extracted sample lives inside the extraction directory
+            cleanup_pool.submit(self.remove_artifacts, Path(sample_path), paths.extract_dir)
 
-            # Cleanup extraction directory if it exists
+    @staticmethod
+    def remove_artifacts(*paths: Path) -> None:
+        """Delete analysis files or directories in order, logging instead of raising"""
+        for path in paths:
             try:
-                extract_dir = self.work_dir / f"{analysis_id}_extracted"
-                if extract_dir.exists():
-                    shutil.rmtree(extract_dir)
-                    logger.info(f"Cleaned up extraction directory: {extract_dir}")
+                if path.is_dir():
+                    shutil.rmtree(path)
+                elif path.exists():
+                    path.unlink()
+                else:
+                    continue
+                logger.info(f"Cleaned up: {path}")
             except Exception as e:
-                logger.warning(f"Failed to cleanup extraction directory: {e}")
+                logger.warning(f"Failed to cleanup {path}: {e}")
 
     def parse_results(self, output_dir: str) -> Optional[Dict]:
         """Parse Noriben output files"""
         try:
-            output_path = Path(output_dir)
-            txt_files = list(output_path.glob("Noriben_*.txt"))
-            csv_files = list(output_path.glob("Noriben_*_timeline.csv"))
-
-            if not txt_files or not csv_files:
+            # Find Noriben_*.txt and Noriben_*_timeline.csv in one directory scan
+            txt_file = csv_file = None
+            with os.scandir(output_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if not name.startswith("Noriben_"):
+                        continue
+                    if name.endswith("_timeline.csv"):
+                        csv_file = csv_file or entry.path
+                    elif name.endswith(".txt"):
+                        txt_file = txt_file or entry.path
+                    if txt_file and csv_file:
+                        break
+
+            if not txt_file or not csv_file:
                 logger.error("Noriben output files not found")
                 return None
 
-            txt_file = str(txt_files[0])
-            csv_file = str(csv_files[0])
-
             logger.info(f"Parsing results from: {txt_file}, {csv_file}")
 
-            # Parse both files
-            txt_data = NoribenParser.parse_txt_report(txt_file)
-            csv_data = NoribenParser.parse_csv_timeline(csv_file)
+            # Parse both files concurrently so the CSV read overlaps the report scan
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                txt_future = executor.submit(NoribenParser.parse_txt_report, txt_file)
+                csv_future = executor.submit(NoribenParser.parse_csv_timeline, csv_file)
+                txt_data = txt_future.result()
+                csv_data = csv_future.result()
 
             # Combine into final report (send raw data to backend)
             report = {
@@ -510,12 +697,18 @@ class MalwareAnalyzer:
 
 # Initialize analyzer
 analyzer = MalwareAnalyzer()
+analysis_lock = threading.Lock()
+
+
+def json_response(obj: Any, status: int = 200):
+    """Build a JSON response serialized with orjson (reports can be large)"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         "status": "healthy",
         "noriben_path": NORIBEN_PATH,
         "work_dir": str(analyzer.work_dir),
@@ -543,7 +736,7 @@ def analyze():
     try:
         # Get uploaded file
         if 'file' not in request.files:
-            return jsonify({"success": False, "error": "No file uploaded"}), 400
+            return json_response({"success": False, "error": "No file uploaded"}, 400)
 
         file = request.files['file']
         analysis_id = request.form.get('analysis_id')
@@ -551,7 +744,7 @@ def analyze():
         is_zip = request.form.get('is_zip', 'false').lower() == 'true'
 
         if not analysis_id:
-            return jsonify({"success": False, "error": "analysis_id required"}), 400
+            return json_response({"success": False, "error": "analysis_id required"}, 400)
 
         logger.info(f"Received analysis request: {analysis_id}")
 
@@ -560,44 +753,48 @@ def analyze():
         print(f"Original filename: {original_filename}")
         file_ext = os.path.splitext(original_filename)[1]  # Get extension like .exe, .dll, etc.
         # Save uploaded file with original extension preserved
-        temp_file = analyzer.work_dir / f"{analysis_id}_upload{file_ext}"
-        file.save(str(temp_file))
+        paths = analyzer.analysis_paths(analysis_id)
+        temp_file = str(analyzer.work_dir / f"{analysis_id}_upload{file_ext}")
+        file.save(temp_file, buffer_size=UPLOAD_BUFFER)
         logger.info(f"Saved uploaded file: {temp_file} (original: {original_filename})")
 
         # Handle zip extraction if needed
         if is_zip:
             logger.info(f"Extracting infected zip: {analysis_id}")
-            sample_path = analyzer.extract_zip(str(temp_file), analysis_id, password)
+            sample_path = analyzer.extract_zip(temp_file, paths, password)
 
             # Clean up zip file
             try:
-                os.remove(str(temp_file))
+                os.remove(temp_file)
             except:
                 pass
 
             if not sample_path:
-                return jsonify({
+                return json_response({
                     "success": False,
                     "error": "Failed to extract zip file"
-                }), 400
+                }, 400)
 
         else:
-            sample_path = str(temp_file)
+            sample_path = temp_file
 
-        # Run analysis synchronously
-        result = analyzer.run_noriben(sample_path, analysis_id)
+        # Run analysis synchronously. Noriben/Procmon allow a single capture, so
+        # concurrent /analyze requests queue here, each waiting for the ones
+        # ahead of it (up to ANALYSIS_TIMEOUT + 60s apiece)
+        with analysis_lock:
+            result = analyzer.run_noriben(sample_path, paths)
 
         if result["success"]:
-            return jsonify(result), 200
+            return json_response(result, 200)
         else:
-            return jsonify(result), 500
+            return json_response(result, 500)
 
     except Exception as e:
         logger.error(f"Analysis request failed: {e}")
-        return jsonify({
+        return json_response({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 500)
 
 
 @app.route('/cleanup/<analysis_id>', methods=['DELETE'])
@@ -606,12 +803,12 @@ def cleanup(analysis_id):
     try:
         output_dir = analyzer.work_dir / analysis_id
         if output_dir.exists():
-            shutil.rmtree(output_dir)
+            cleanup_pool.submit(analyzer.remove_artifacts, output_dir)
 
-        return jsonify({"success": True}), 200
+        return json_response({"success": True}, 200)
     except Exception as e:
         logger.error(f"Cleanup failed: {e}")
-        return jsonify({"success": False, "error": str(e)}), 500
+        return json_response({"success": False, "error": str(e)}, 500)
 
 
 def main():
@@ -632,10 +829,10 @@ def main():
     logger.info(f"Work directory: {analyzer.work_dir}")
     logger.info(f"ZIP extraction tool: {UNZIP_TOOL}")
     logger.info(f"ZIP extraction path: {UNZIP_PATH}")
-    logger.info(f"Listening on: {args.host}:{args.port}")
+    logger.info(f"Listening on: {args.host}:{args.port} ({AGENT_THREADS} threads)")
     logger.info("="*60)
 
-    app.run(host=args.host, port=args.port, debug=False)
+    serve(app, host=args.host, port=args.port, threads=AGENT_THREADS)
 
 
 if __name__ == "__main__":